@@ -0,0 +1,31 @@
+"""
+Shared pytest configuration for TokenGoblin tests
+"""
+
+import pytest
+
+from utils.event_loop import get_event_loop_policy
+
+
+def pytest_addoption(parser):
+    """Register command line options"""
+    parser.addoption(
+        "--runslow", action="store_true", default=False, help="run tests marked as slow"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip slow tests unless --runslow is given"""
+    if config.getoption("--runslow"):
+        return
+    
+    skip_slow = pytest.mark.skip(reason="need --runslow option to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run the shared session event loop on uvloop when it is installed"""
+    return get_event_loop_policy()
@@ -26,7 +26,7 @@ class AgenticTestRunner:
         print("🚀 Starting TokenGoblin Agentic Functionality Tests")
         print("=" * 60)
         
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         
         # Run unit tests
         print("\n📋 Running Unit Tests...")
@@ -40,7 +40,7 @@ class AgenticTestRunner:
         print("\n📊 Running Effectiveness Tests...")
         effectiveness_results = self._run_effectiveness_tests()
         
-        self.end_time = time.time()
+        self.end_time = time.perf_counter()
         
         # Compile results
         self.test_results = {
@@ -46,9 +46,7 @@ class AITokenService:
             pricing = await self.openrouter_service.get_model_pricing(self.default_model)
             
             # 2. Calculate USD cost for the tokens
-            input_cost_per_token = pricing['input_price_per_1k_tokens'] / 1000
-            output_cost_per_token = pricing['output_price_per_1k_tokens'] / 1000
-            avg_cost_per_token = (input_cost_per_token + output_cost_per_token) / 2
+            avg_cost_per_token = pricing['avg_cost_per_token']
             
             base_usd_cost = token_count * avg_cost_per_token
             
@@ -300,9 +298,7 @@ class AITokenService:
         try:
             pricing = await self.openrouter_service.get_model_pricing(self.default_model)
             
-            input_cost_per_token = pricing['input_price_per_1k_tokens'] / 1000
-            output_cost_per_token = pricing['output_price_per_1k_tokens'] / 1000
-            avg_cost_per_token = (input_cost_per_token + output_cost_per_token) / 2
+            avg_cost_per_token = pricing['avg_cost_per_token']
             
             # Account for markup
             max_base_cost = budget_usd / (1 + self.markup_percentage)
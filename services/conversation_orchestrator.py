@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import re
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,6 +13,20 @@ from services.notification import NotificationService
 
 logger = logging.getLogger(__name__)
 
+# Agentic sales triggers, compiled once so each message is scanned in a single pass
+SALES_KEYWORDS = ('buy', 'purchase', 'get', 'order', 'want', 'need', 'looking for', 'cost', 'price', 'how much', 'tokens')
+SALES_KEYWORD_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in SALES_KEYWORDS))
+
+# Payment method preferences, in priority order
+PAYMENT_KEYWORDS = {
+    'usdt': ('usdt', 'tether', 'trc20'),
+    'bitcoin': ('bitcoin', 'btc', 'bit coin'),
+    'ethereum': ('ethereum', 'eth', 'ether')
+}
+PAYMENT_KEYWORD_SET = tuple(keyword for keywords in PAYMENT_KEYWORDS.values() for keyword in keywords)
+# Longest keywords first, so 'tether' is matched whole rather than as 'ether'
+PAYMENT_KEYWORD_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in sorted(PAYMENT_KEYWORD_SET, key=len, reverse=True)))
+
 
 class ConversationOrchestrator:
     """Orchestrates all conversational AI components for engaging user interactions"""
@@ -100,8 +115,7 @@ class ConversationOrchestrator:
         message_lower = user_message.lower()
         
         # Agentic sales triggers - proactively identify sales opportunities
-        sales_keywords = ['buy', 'purchase', 'get', 'order', 'want', 'need', 'looking for', 'cost', 'price', 'how much', 'tokens']
-        is_sales_opportunity = any(keyword in message_lower for keyword in sales_keywords)
+        is_sales_opportunity = SALES_KEYWORD_PATTERN.search(message_lower) is not None
         
         # If user shows any interest in tokens or purchasing, prioritize agentic sales flow
         if is_sales_opportunity:
@@ -309,14 +323,10 @@ class ConversationOrchestrator:
             }
         
         # Check for payment method preferences
-        payment_keywords = {
-            'usdt': ['usdt', 'tether', 'trc20'],
-            'bitcoin': ['bitcoin', 'btc', 'bit coin'],
-            'ethereum': ['ethereum', 'eth', 'ether']
-        }
+        matched_keywords = set(PAYMENT_KEYWORD_PATTERN.findall(message_lower))
         
-        for payment_type, keywords in payment_keywords.items():
-            if any(keyword in message_lower for keyword in keywords):
+        for payment_type, keywords in PAYMENT_KEYWORDS.items():
+            if matched_keywords.intersection(keywords):
                 response = (
                     f"💳 Excellent choice! **{payment_type.upper()}** is a great payment method.\n\n"
                     f"**Agentic Action**: I'll set up your payment request with {payment_type.upper()}.\n\n"
@@ -28,18 +28,28 @@ class OpenRouterService:
                 else:
                     raise Exception(f"Failed to get models: {response.status}")
     
+    @staticmethod
+    def _build_model_pricing(model: Dict) -> Dict:
+        """Build the pricing summary for a model entry from the models list"""
+        # Prices may arrive as strings; parse them once here rather than on every use
+        input_price = float(model.get('pricing', {}).get('input', 0))
+        output_price = float(model.get('pricing', {}).get('output', 0))
+        return {
+            'model_id': model['id'],
+            'name': model['name'],
+            'input_price_per_1k_tokens': input_price,
+            'output_price_per_1k_tokens': output_price,
+            # Estimate average cost per token (input + output)
+            'avg_cost_per_token': (input_price + output_price) / 2000,
+            'context_length': model.get('context_length', 0)
+        }
+    
     async def get_model_pricing(self, model_id: str) -> Dict:
         """Get pricing information for a specific model"""
         models = await self.get_available_models()
         for model in models:
             if model['id'] == model_id:
-                return {
-                    'model_id': model['id'],
-                    'name': model['name'],
-                    'input_price_per_1k_tokens': model.get('pricing', {}).get('input', 0),
-                    'output_price_per_1k_tokens': model.get('pricing', {}).get('output', 0),
-                    'context_length': model.get('context_length', 0)
-                }
+                return self._build_model_pricing(model)
         raise Exception(f"Model {model_id} not found")
     
     async def purchase_tokens(self, model_id: str, token_amount: int, budget: float) -> Dict:
@@ -47,12 +57,7 @@ class OpenRouterService:
         pricing = await self.get_model_pricing(model_id)
         
         # Calculate how many tokens we can buy with the budget
-        input_cost_per_token = pricing['input_price_per_1k_tokens'] / 1000
-        output_cost_per_token = pricing['output_price_per_1k_tokens'] / 1000
-        
-        # Estimate average cost per token (input + output)
-        avg_cost_per_token = (input_cost_per_token + output_cost_per_token) / 2
-        
+        avg_cost_per_token = pricing['avg_cost_per_token']
         max_tokens_with_budget = int(budget / avg_cost_per_token)
         actual_tokens = min(token_amount, max_tokens_with_budget)
         
@@ -123,10 +128,9 @@ class OpenRouterService:
         
         for model in claude_models:
             try:
-                pricing = await self.get_model_pricing(model['id'])
-                input_cost = pricing['input_price_per_1k_tokens'] / 1000
-                output_cost = pricing['output_price_per_1k_tokens'] / 1000
-                avg_cost = (input_cost + output_cost) / 2
+                # Price from the list already fetched instead of re-fetching it per model
+                pricing = self._build_model_pricing(model)
+                avg_cost = pricing['avg_cost_per_token']
                 
                 tokens_possible = int(budget / avg_cost)
                 value_score = tokens_possible / target_tokens  # Higher is better
@@ -12,6 +12,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import *
 from db import create_db_and_tables
+from utils.event_loop import get_event_loop_policy
 import logging
 
 # Set up logging
@@ -25,38 +26,43 @@ async def test_basic_functionality():
         await create_db_and_tables()
         logger.info("✅ Database and tables created successfully")
         
-        print("\n🎉 TokenGoblin Bot Setup Complete!")
-        print("=" * 50)
-        print("✅ Database: SQLite database created in data/ folder")
-        print("✅ Configuration: All settings loaded successfully")
-        print("✅ Dependencies: All Python packages installed")
+        # Collect the setup summary and write it to stdout in one call
+        out = []
         
-        print("\n📋 Bot Features:")
-        print("• Digital goods marketplace")
-        print("• Cryptocurrency payments (BTC, LTC, SOL, USDT)")
-        print("• Admin panel for inventory management")
-        print("• User registration and profiles")
-        print("• Shopping cart functionality")
-        print("• Purchase history tracking")
-        print("• Multi-language support")
+        out.append("\n🎉 TokenGoblin Bot Setup Complete!")
+        out.append("=" * 50)
+        out.append("✅ Database: SQLite database created in data/ folder")
+        out.append("✅ Configuration: All settings loaded successfully")
+        out.append("✅ Dependencies: All Python packages installed")
         
-        print("\n🔧 Next Steps to Run the Bot:")
-        print("1. Get a Telegram bot token from @BotFather")
-        print("2. Get your Telegram ID from @userinfobot")
-        print("3. Update the .env file with your credentials:")
-        print("   TOKEN=your_bot_token_here")
-        print("   ADMIN_ID_LIST=your_telegram_id_here")
-        print("4. Run: python run.py")
+        out.append("\n📋 Bot Features:")
+        out.append("• Digital goods marketplace")
+        out.append("• Cryptocurrency payments (BTC, LTC, SOL, USDT)")
+        out.append("• Admin panel for inventory management")
+        out.append("• User registration and profiles")
+        out.append("• Shopping cart functionality")
+        out.append("• Purchase history tracking")
+        out.append("• Multi-language support")
         
-        print("\n📚 Documentation:")
-        print("• Main README: readme.md")
-        print("• Local deployment guide: LOCAL_DEPLOYMENT_GUIDE.md")
-        print("• Agentic features: README_AGENTIC.md")
+        out.append("\n🔧 Next Steps to Run the Bot:")
+        out.append("1. Get a Telegram bot token from @BotFather")
+        out.append("2. Get your Telegram ID from @userinfobot")
+        out.append("3. Update the .env file with your credentials:")
+        out.append("   TOKEN=your_bot_token_here")
+        out.append("   ADMIN_ID_LIST=your_telegram_id_here")
+        out.append("4. Run: python run.py")
+        
+        out.append("\n📚 Documentation:")
+        out.append("• Main README: readme.md")
+        out.append("• Local deployment guide: LOCAL_DEPLOYMENT_GUIDE.md")
+        out.append("• Agentic features: README_AGENTIC.md")
+        
+        sys.stdout.write("\n".join(out) + "\n")
         
         return True
         
     except Exception as e:
-        logger.error(f"❌ Test failed: {e}")
+        logger.error("❌ Test failed: %s", e)
         return False
 
 def test_configuration():
@@ -98,4 +104,6 @@ def main():
         print("\n❌ Some tests failed. Please check the error messages above.")
 
 if __name__ == "__main__":
+    asyncio.set_event_loop_policy(get_event_loop_policy())
+    
     main() 
\ No newline at end of file
@@ -6,17 +6,26 @@ payment recognition, and proactive responses.
 """
 
 import pytest
-import asyncio
-from unittest.mock import Mock, AsyncMock, patch
+import re
+from unittest.mock import Mock
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 # Import the components we need to test
 from services.conversation_orchestrator import ConversationOrchestrator
-from services.conversation_memory import ConversationMemory
-from services.conversational_persona import ConversationalPersona
-from services.emotional_intelligence import EmotionalIntelligence
-from enums.bot_entity import BotEntity
+
+# One-pass scanners for the multi-keyword response checks
+PACKAGE_PATTERN = re.compile(r"10,000 tokens|5,000 tokens|1,000 tokens|Quick Start|Developer Pack|Pro Pack")
+PAYMENT_PATTERN = re.compile(r"USDT|Bitcoin|BTC|Ethereum|ETH|TRC20|ERC20")
+PAYMENT_CANONICAL = {
+    "USDT": "USDT",
+    "Bitcoin": "BTC",
+    "BTC": "BTC",
+    "Ethereum": "ETH",
+    "ETH": "ETH",
+    "TRC20": "NETWORK",
+    "ERC20": "NETWORK"
+}
 
 
 class TestAgenticFunctionality:
@@ -252,12 +261,9 @@ class TestAgenticFunctionality:
         response = response_data['response']
         
         # Check for package recommendations
-        assert "1,000 tokens" in response
-        assert "5,000 tokens" in response
-        assert "10,000 tokens" in response
-        assert "Quick Start" in response
-        assert "Developer Pack" in response
-        assert "Pro Pack" in response
+        required = {"1,000 tokens", "5,000 tokens", "10,000 tokens", "Quick Start", "Developer Pack", "Pro Pack"}
+        found = set(PACKAGE_PATTERN.findall(response))
+        assert required <= found, f"Missing package recommendations: {required - found}"
     
     @pytest.mark.asyncio
     async def test_payment_options_presentation(self, conversation_orchestrator, sample_user_context):
@@ -270,10 +276,9 @@ class TestAgenticFunctionality:
         response = response_data['response']
         
         # Check for payment options
-        assert "USDT" in response
-        assert "Bitcoin" in response or "BTC" in response
-        assert "Ethereum" in response or "ETH" in response
-        assert "TRC20" in response or "ERC20" in response
+        required = {"USDT", "BTC", "ETH", "NETWORK"}
+        found = {PAYMENT_CANONICAL[match] for match in PAYMENT_PATTERN.findall(response)}
+        assert required <= found, f"Missing payment options: {required - found}"
     
     @pytest.mark.asyncio
     async def test_agentic_action_prompts(self, conversation_orchestrator, sample_user_context):
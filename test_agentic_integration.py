@@ -6,80 +6,158 @@ Tests the complete agentic flow from user interaction to sales completion.
 
 import pytest
 import asyncio
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
-from sqlalchemy.orm import Session
+from unittest.mock import Mock, patch, MagicMock
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from datetime import datetime
+from dataclasses import dataclass
 import json
+import re
+import statistics
+import time
 
 # Import the components we need to test
 from services.conversation_orchestrator import ConversationOrchestrator
 from services.conversation_memory import ConversationMemory
 from services.conversational_persona import ConversationalPersona
 from services.emotional_intelligence import EmotionalIntelligence
-from handlers.user.ai_tokens import ai_tokens_text_message
-from run_agentic import handle_conversational_ai_message
+
+# Fixed timestamp shared by the mocked user context and conversation history
+NOW_ISO = datetime(2024, 1, 1, 12, 0, 0).isoformat()
+
+# Payment method inputs and the normalized method the orchestrator should echo
+PAYMENT_METHODS = {
+    "USDT": "USDT",
+    "Bitcoin": "BITCOIN",
+    "BTC": "BITCOIN",
+    "Ethereum": "ETHEREUM",
+    "ETH": "ETHEREUM",
+    "Tether": "USDT"
+}
+
+# Pre-bound message templates for the parametrized cases
+PAY_WITH_MESSAGE = "I want to pay with {}".format
+NEED_TOKENS_MESSAGE = "I need {} tokens".format
+TRIGGER_MESSAGE = "I {} tokens".format
+
+# Response elements checked in a single pass instead of one substring scan each
+RESPONSE_KEYS = ('response', 'personality_traits_used', 'emotional_tone', 'suggested_actions')
+PERFORMANCE_ROUNDS = 5
+ENGAGEMENT_ELEMENTS = (
+    "?",  # Questions
+    "packages",  # Specific offerings
+    "Agentic Action",  # Clear next steps
+    "🚀",  # Emojis for engagement
+    "tokens"  # Core product
+)
+QUALITY_PATTERN = re.compile(r"1000|\$|Agentic Action|(?i:payment)")
+QUALITY_ELEMENTS = {"1000", "$", "agentic action", "payment"}
+
+
+@dataclass(slots=True, frozen=True)
+class _FakeUser:
+    """Lightweight stand-in for a Telegram user"""
+    id: int
+    first_name: str
+    last_name: str
+    username: str
+
+
+@dataclass(slots=True, frozen=True)
+class _FakeChat:
+    """Lightweight stand-in for a Telegram chat"""
+    id: int
+
+
+@dataclass(slots=True, frozen=True)
+class _FakeMessage:
+    """Lightweight stand-in for a Telegram message"""
+    from_user: _FakeUser
+    chat: _FakeChat
+    text: str
+
+
+TELEGRAM_MESSAGE = _FakeMessage(
+    from_user=_FakeUser(id=12345, first_name="Test", last_name="User", username="testuser"),
+    chat=_FakeChat(id=12345),
+    text="I want to buy tokens"
+)
+
+
+def _configure_orchestrator_mocks(orchestrator):
+    """Apply the default mock responses to an orchestrator's dependencies"""
+    orchestrator.memory.get_user_context.return_value = {
+        'user_id': 12345,
+        'first_name': 'Test',
+        'last_name': 'User',
+        'interaction_count': 1,
+        'experience_level': 'beginner',
+        'has_purchased': False,
+        'conversation_history': [],
+        'last_interaction': NOW_ISO
+    }
+    
+    orchestrator.emotional_intelligence.analyze_emotion.return_value = {
+        'primary_emotion': 'excitement',
+        'confidence': 0.78,
+        'emotional_intensity': 'high'
+    }
+
+
+def _build_orchestrator():
+    """Build an orchestrator with mocked memory, persona and emotional intelligence"""
+    orchestrator = ConversationOrchestrator()
+    
+    # Mock the dependencies
+    orchestrator.memory = Mock(spec=ConversationMemory)
+    orchestrator.persona = Mock(spec=ConversationalPersona)
+    orchestrator.emotional_intelligence = Mock(spec=EmotionalIntelligence)
+    
+    _configure_orchestrator_mocks(orchestrator)
+    return orchestrator
+
+
+@pytest.fixture(scope="session")
+async def sqlite_engine():
+    """Create one in-memory SQLite engine for the whole test session"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.dispose()
 
 
 class TestAgenticIntegration:
     """Integration tests for complete agentic flow"""
     
-    @pytest.fixture
-    async def full_orchestrator_setup(self):
-        """Set up a complete orchestrator with all dependencies"""
-        orchestrator = ConversationOrchestrator()
-        
-        # Mock the dependencies
-        orchestrator.memory = Mock(spec=ConversationMemory)
-        orchestrator.persona = Mock(spec=ConversationalPersona)
-        orchestrator.emotional_intelligence = Mock(spec=EmotionalIntelligence)
-        
-        # Set up mock responses
-        orchestrator.memory.get_user_context.return_value = {
-            'user_id': 12345,
-            'first_name': 'Test',
-            'last_name': 'User',
-            'interaction_count': 1,
-            'experience_level': 'beginner',
-            'has_purchased': False,
-            'conversation_history': [],
-            'last_interaction': datetime.now().isoformat()
-        }
-        
-        orchestrator.emotional_intelligence.analyze_sentiment.return_value = {
-            'sentiment': 'positive',
-            'confidence': 0.85,
-            'intent': 'purchase'
-        }
-        
-        orchestrator.emotional_intelligence.analyze_emotion.return_value = {
-            'primary_emotion': 'excitement',
-            'confidence': 0.78,
-            'emotional_intensity': 'high'
-        }
-        
-        return orchestrator
+    @pytest.fixture(scope="module")
+    def full_orchestrator_setup(self):
+        """Set up a complete orchestrator with all dependencies, shared across the module"""
+        return _build_orchestrator()
     
-    @pytest.fixture
+    @pytest.fixture(autouse=True)
+    def _reset_orchestrator_mocks(self, full_orchestrator_setup):
+        """Reset call history, side effects and return values after each test"""
+        yield
+        full_orchestrator_setup.memory.reset_mock(return_value=True, side_effect=True)
+        full_orchestrator_setup.persona.reset_mock(return_value=True, side_effect=True)
+        full_orchestrator_setup.emotional_intelligence.reset_mock(return_value=True, side_effect=True)
+        _configure_orchestrator_mocks(full_orchestrator_setup)
+    
+    @pytest.fixture(scope="session")
     def mock_telegram_message(self):
-        """Create a mock Telegram message"""
-        message = Mock()
-        message.from_user.id = 12345
-        message.from_user.first_name = "Test"
-        message.from_user.last_name = "User"
-        message.from_user.username = "testuser"
-        message.text = "I want to buy tokens"
-        message.chat.id = 12345
-        return message
+        """Provide a shared, immutable fake Telegram message"""
+        return TELEGRAM_MESSAGE
+    
+    @pytest.fixture
+    def payment_case(self, request):
+        """Resolve a payment input into its prebuilt message and expected method"""
+        user_input = request.param
+        return user_input, PAY_WITH_MESSAGE(user_input), PAYMENT_METHODS[user_input]
     
     @pytest.fixture
-    def mock_session(self):
-        """Create a mock database session"""
-        session = Mock(spec=Session)
-        session.commit = AsyncMock()
-        session.rollback = AsyncMock()
-        return session
+    async def mock_session(self, sqlite_engine):
+        """Create a real async session on the shared in-memory database"""
+        async with AsyncSession(sqlite_engine) as session:
+            yield session
 
-    @pytest.mark.asyncio
     async def test_complete_agentic_sales_flow(self, full_orchestrator_setup, mock_telegram_message, mock_session):
         """Test the complete agentic sales flow from start to finish"""
         
@@ -103,7 +181,6 @@ class TestAgenticIntegration:
         assert "Agentic Action" in response
         assert "payment method" in response.lower()
     
-    @pytest.mark.asyncio
     async def test_agentic_sales_progression(self, full_orchestrator_setup, mock_session):
         """Test the progression of agentic sales conversation"""
         
@@ -138,7 +215,6 @@ class TestAgenticIntegration:
         assert "USDT" in response3['response']
         assert "payment request" in response3['response'].lower()
     
-    @pytest.mark.asyncio
     async def test_agentic_greeting_to_sales_conversion(self, full_orchestrator_setup, mock_session):
         """Test conversion from greeting to sales"""
         
@@ -164,53 +240,40 @@ class TestAgenticIntegration:
         assert "packages" in interest_response['response'].lower()
         assert "Agentic Action" in interest_response['response']
     
-    @pytest.mark.asyncio
-    async def test_agentic_payment_method_handling(self, full_orchestrator_setup, mock_session):
+    @pytest.mark.parametrize("payment_case", list(PAYMENT_METHODS), indirect=True)
+    async def test_agentic_payment_method_handling(self, full_orchestrator_setup, mock_session, payment_case):
         """Test agentic handling of different payment methods"""
         
-        payment_methods = [
-            ("USDT", "USDT"),
-            ("Bitcoin", "BITCOIN"),
-            ("BTC", "BITCOIN"),
-            ("Ethereum", "ETHEREUM"),
-            ("ETH", "ETHEREUM"),
-            ("Tether", "USDT")
-        ]
+        user_input, user_message, expected_method = payment_case
+        response = await full_orchestrator_setup.handle_conversation(
+            user_id=12345,
+            user_message=user_message,
+            session=mock_session
+        )
         
-        for user_input, expected_method in payment_methods:
-            response = await full_orchestrator_setup.handle_conversation(
-                user_id=12345,
-                user_message=f"I want to pay with {user_input}",
-                session=mock_session
-            )
-            
-            assert expected_method in response['response'], f"Failed to recognize {user_input}"
-            assert "payment request" in response['response'].lower()
+        assert expected_method in response['response'], f"Failed to recognize {user_input}"
+        assert "payment request" in response['response'].lower()
     
-    @pytest.mark.asyncio
-    async def test_agentic_token_calculation_accuracy(self, full_orchestrator_setup, mock_session):
+    @pytest.mark.parametrize("token_amount,expected_price", [
+        (1000, 20.0),
+        (5000, 95.0),
+        (10000, 180.0),
+        (2500, 45.0),
+        (15000, 270.0)
+    ])
+    async def test_agentic_token_calculation_accuracy(self, full_orchestrator_setup, mock_session, token_amount, expected_price):
         """Test accuracy of token calculations in agentic responses"""
         
-        test_cases = [
-            (1000, 20.0),
-            (5000, 95.0),
-            (10000, 180.0),
-            (2500, 45.0),
-            (15000, 270.0)
-        ]
+        response = await full_orchestrator_setup.handle_conversation(
+            user_id=12345,
+            user_message=NEED_TOKENS_MESSAGE(token_amount),
+            session=mock_session
+        )
         
-        for token_amount, expected_price in test_cases:
-            response = await full_orchestrator_setup.handle_conversation(
-                user_id=12345,
-                user_message=f"I need {token_amount} tokens",
-                session=mock_session
-            )
-            
-            response_text = response['response']
-            assert str(expected_price) in response_text, f"Price {expected_price} not found for {token_amount} tokens"
-            assert str(token_amount) in response_text, f"Token amount {token_amount} not found in response"
+        response_text = response['response']
+        assert str(expected_price) in response_text, f"Price {expected_price} not found for {token_amount} tokens"
+        assert str(token_amount) in response_text, f"Token amount {token_amount} not found in response"
     
-    @pytest.mark.asyncio
     async def test_agentic_user_context_persistence(self, full_orchestrator_setup, mock_session):
         """Test that user context is maintained throughout agentic interactions"""
         
@@ -234,72 +297,63 @@ class TestAgenticIntegration:
         # Should maintain context
         assert full_orchestrator_setup.memory.get_user_context.call_count >= 2
     
-    @pytest.mark.asyncio
-    async def test_agentic_emotional_intelligence_integration(self, full_orchestrator_setup, mock_session):
+    @pytest.mark.parametrize("message,expected_emotion", [
+        ("I'm excited to buy tokens!", "excitement"),
+        ("I'm worried about the cost", "concern"),
+        ("I need help with tokens", "confusion")
+    ])
+    async def test_agentic_emotional_intelligence_integration(self, full_orchestrator_setup, mock_session, message, expected_emotion):
         """Test that emotional intelligence is integrated into agentic responses"""
         
-        # Test with different emotional contexts
-        emotional_contexts = [
-            ("I'm excited to buy tokens!", "excitement"),
-            ("I'm worried about the cost", "concern"),
-            ("I need help with tokens", "confusion")
-        ]
+        # Update mock to return the emotional context under test
+        full_orchestrator_setup.emotional_intelligence.analyze_emotion.return_value = {
+            'primary_emotion': expected_emotion,
+            'confidence': 0.8,
+            'emotional_intensity': 'medium'
+        }
         
-        for message, expected_emotion in emotional_contexts:
-            # Update mock to return different emotions
-            full_orchestrator_setup.emotional_intelligence.analyze_emotion.return_value = {
-                'primary_emotion': expected_emotion,
-                'confidence': 0.8,
-                'emotional_intensity': 'medium'
-            }
-            
-            response = await full_orchestrator_setup.handle_conversation(
-                user_id=12345,
-                user_message=message,
-                session=mock_session
-            )
-            
-            # Should have appropriate emotional tone
-            assert 'emotional_tone' in response
-            assert response['emotional_tone'] in ['excited', 'supportive', 'empathetic', 'helpful']
+        response = await full_orchestrator_setup.handle_conversation(
+            user_id=12345,
+            user_message=message,
+            session=mock_session
+        )
+        
+        # Should have appropriate emotional tone
+        assert 'emotional_tone' in response
+        assert response['emotional_tone'] in ['excited', 'supportive', 'empathetic', 'helpful']
     
-    @pytest.mark.asyncio
-    async def test_agentic_sales_optimization(self, full_orchestrator_setup, mock_session):
+    @pytest.mark.parametrize("trigger", [
+        "tokens",
+        "buy",
+        "purchase",
+        "price",
+        "cost",
+        "need",
+        "want"
+    ])
+    async def test_agentic_sales_optimization(self, full_orchestrator_setup, mock_session, trigger):
         """Test that agentic responses are optimized for sales conversion"""
         
-        # Test various sales triggers
-        sales_triggers = [
-            "tokens",
-            "buy",
-            "purchase",
-            "price",
-            "cost",
-            "need",
-            "want"
-        ]
+        response = await full_orchestrator_setup.handle_conversation(
+            user_id=12345,
+            user_message=TRIGGER_MESSAGE(trigger),
+            session=mock_session
+        )
         
-        for trigger in sales_triggers:
-            response = await full_orchestrator_setup.handle_conversation(
-                user_id=12345,
-                user_message=f"I {trigger} tokens",
-                session=mock_session
-            )
-            
-            # Should provide immediate actionable information
-            response_text = response['response']
-            assert "Agentic Action" in response_text
-            assert "tokens" in response_text.lower()
-            assert "payment" in response_text.lower() or "package" in response_text.lower()
+        # Should provide immediate actionable information
+        response_text = response['response']
+        assert "Agentic Action" in response_text
+        assert "tokens" in response_text.lower()
+        assert "payment" in response_text.lower() or "package" in response_text.lower()
     
-    @pytest.mark.asyncio
     async def test_agentic_conversation_memory(self, full_orchestrator_setup, mock_session):
         """Test that conversation memory enhances agentic responses"""
         
         # Simulate conversation history
         conversation_history = [
-            {'message': 'Hello', 'response': 'Hi! How can I help?', 'timestamp': datetime.now().isoformat()},
-            {'message': 'I want tokens', 'response': 'Great! How many?', 'timestamp': datetime.now().isoformat()},
-            {'message': '1000 tokens', 'response': 'Perfect! $20 USD', 'timestamp': datetime.now().isoformat()}
+            {'message': 'Hello', 'response': 'Hi! How can I help?', 'timestamp': NOW_ISO},
+            {'message': 'I want tokens', 'response': 'Great! How many?', 'timestamp': NOW_ISO},
+            {'message': '1000 tokens', 'response': 'Perfect! $20 USD', 'timestamp': NOW_ISO}
         ]
         
         # Update mock to return conversation history
@@ -321,7 +375,6 @@ class TestAgenticIntegration:
         response_text = response['response']
         assert "proceed" in response_text.lower() or "continue" in response_text.lower() or "payment" in response_text.lower()
     
-    @pytest.mark.asyncio
     async def test_agentic_error_handling(self, full_orchestrator_setup, mock_session):
         """Test that agentic system handles errors gracefully"""
         
@@ -339,42 +392,41 @@ class TestAgenticIntegration:
         assert 'response' in response
         assert len(response['response']) > 0
     
-    @pytest.mark.asyncio
     async def test_agentic_performance_metrics(self, full_orchestrator_setup, mock_session):
         """Test that agentic system provides performance metrics"""
         
-        # Test response time
-        import time
-        start_time = time.time()
-        
-        response = await full_orchestrator_setup.handle_conversation(
-            user_id=12345,
-            user_message="I need 1000 tokens",
-            session=mock_session
-        )
-        
-        end_time = time.time()
-        response_time = end_time - start_time
+        # Test response time over repeated rounds
+        elapsed_ns = []
+        for _ in range(PERFORMANCE_ROUNDS):
+            start_ns = time.perf_counter_ns()
+            response = await full_orchestrator_setup.handle_conversation(
+                user_id=12345,
+                user_message="I need 1000 tokens",
+                session=mock_session
+            )
+            elapsed_ns.append(time.perf_counter_ns() - start_ns)
         
-        # Should respond quickly (under 1 second for unit test)
-        assert response_time < 1.0, f"Response too slow: {response_time:.2f}s"
+        # Should respond quickly (median under 1 second for unit test)
+        median_ns = statistics.median(elapsed_ns)
+        assert median_ns < 1_000_000_000, f"Response too slow: {median_ns / 1e6:.1f}ms median"
         
         # Should provide structured response
-        assert 'response' in response
-        assert 'personality_traits_used' in response
-        assert 'emotional_tone' in response
-        assert 'suggested_actions' in response
+        missing = [key for key in RESPONSE_KEYS if key not in response]
+        assert not missing, f"Missing response keys: {missing}"
 
 
+@pytest.mark.slow
 class TestAgenticEffectivenessMetrics:
     """Test suite for measuring agentic effectiveness"""
     
-    @pytest.mark.asyncio
-    async def test_sales_conversion_rate_optimization(self):
+    @pytest.fixture(scope="class")
+    def real_orchestrator(self):
+        """Create one real orchestrator shared by the effectiveness tests"""
+        return ConversationOrchestrator()
+    
+    async def test_sales_conversion_rate_optimization(self, real_orchestrator):
         """Test that agentic responses optimize for sales conversion"""
         
-        orchestrator = ConversationOrchestrator()
-        
         # Test conversion optimization
         conversion_triggers = [
             "I want to buy",
@@ -383,11 +435,12 @@ class TestAgenticEffectivenessMetrics:
             "What packages?"
         ]
         
-        for trigger in conversion_triggers:
-            response_data = await orchestrator._handle_agentic_sales_flow(
-                trigger, {}, []
-            )
-            
+        responses = await asyncio.gather(*(
+            real_orchestrator._handle_agentic_sales_flow(trigger, {}, [])
+            for trigger in conversion_triggers
+        ))
+        
+        for response_data in responses:
             response = response_data['response']
             
             # Should include conversion elements
@@ -395,48 +448,32 @@ class TestAgenticEffectivenessMetrics:
             assert "payment" in response.lower() or "order" in response.lower()
             assert "tokens" in response.lower()
     
-    @pytest.mark.asyncio
-    async def test_user_engagement_optimization(self):
+    async def test_user_engagement_optimization(self, real_orchestrator):
         """Test that responses optimize for user engagement"""
         
-        orchestrator = ConversationOrchestrator()
-        
-        response_data = await orchestrator._handle_greeting_flow(
+        response_data = await real_orchestrator._handle_greeting_flow(
             "Hello", {}, []
         )
         
         response = response_data['response']
         
         # Engagement optimization checks
-        engagement_elements = [
-            "?",  # Questions
-            "packages",  # Specific offerings
-            "Agentic Action",  # Clear next steps
-            "🚀",  # Emojis for engagement
-            "tokens"  # Core product
-        ]
-        
-        for element in engagement_elements:
-            assert element in response, f"Missing engagement element: {element}"
+        missing = [element for element in ENGAGEMENT_ELEMENTS if element not in response]
+        assert not missing, f"Missing engagement elements: {missing}"
     
-    @pytest.mark.asyncio
-    async def test_response_quality_metrics(self):
+    async def test_response_quality_metrics(self, real_orchestrator):
         """Test response quality metrics"""
         
-        orchestrator = ConversationOrchestrator()
-        
-        response_data = await orchestrator._handle_agentic_sales_flow(
+        response_data = await real_orchestrator._handle_agentic_sales_flow(
             "1000 tokens", {}, []
         )
         
         response = response_data['response']
         
-        # Quality metrics
+        # Quality metrics: specific information, pricing, clear action and next step
         assert len(response) > 100  # Substantial response
-        assert "1000" in response  # Specific information
-        assert "$" in response  # Pricing information
-        assert "Agentic Action" in response  # Clear action
-        assert "payment" in response.lower()  # Next step
+        found = {match.lower() for match in QUALITY_PATTERN.findall(response)}
+        assert found == QUALITY_ELEMENTS, f"Missing quality elements: {QUALITY_ELEMENTS - found}"
 
 
 if __name__ == "__main__":
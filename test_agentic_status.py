@@ -5,19 +5,23 @@ Quick status check of agentic functionality without running full tests.
 """
 
 import asyncio
+import sys
 from services.conversation_orchestrator import ConversationOrchestrator
 
 
 async def check_agentic_status():
     """Check the current status of agentic functionality"""
     
-    print("🤖 TokenGoblin Agentic Status Check")
-    print("=" * 50)
+    # Collect the report and write it to stdout in one call
+    out = []
+    
+    out.append("🤖 TokenGoblin Agentic Status Check")
+    out.append("=" * 50)
     
     orchestrator = ConversationOrchestrator()
     
     # Test 1: Sales Detection
-    print("\n1. Testing Sales Detection...")
+    out.append("\n1. Testing Sales Detection...")
     test_messages = [
         "I want to buy tokens",
         "How much do tokens cost?",
@@ -29,10 +33,10 @@ async def check_agentic_status():
             message, {}, {}, {}
         )
         status = "✅" if flow == 'agentic_sales' else "❌"
-        print(f"   {status} '{message}' -> {flow}")
+        out.append(f"   {status} '{message}' -> {flow}")
     
     # Test 2: Token Calculation
-    print("\n2. Testing Token Calculation...")
+    out.append("\n2. Testing Token Calculation...")
     test_amounts = [1000, 5000, 10000]
     
     for amount in test_amounts:
@@ -43,10 +47,10 @@ async def check_agentic_status():
         has_amount = str(amount) in response_text or f"{amount:,}" in response_text
         has_price = "$" in response_text
         status = "✅" if has_amount and has_price else "❌"
-        print(f"   {status} {amount} tokens -> Amount: {has_amount}, Price: {has_price}")
+        out.append(f"   {status} {amount} tokens -> Amount: {has_amount}, Price: {has_price}")
     
     # Test 3: Payment Recognition
-    print("\n3. Testing Payment Recognition...")
+    out.append("\n3. Testing Payment Recognition...")
     payment_methods = ["USDT", "Bitcoin", "Ethereum"]
     
     for method in payment_methods:
@@ -56,10 +60,10 @@ async def check_agentic_status():
         response_text = response['response']
         has_method = method.upper() in response_text
         status = "✅" if has_method else "❌"
-        print(f"   {status} {method} -> Recognized: {has_method}")
+        out.append(f"   {status} {method} -> Recognized: {has_method}")
     
     # Test 4: Proactive Greeting
-    print("\n4. Testing Proactive Greeting...")
+    out.append("\n4. Testing Proactive Greeting...")
     greeting_response = await orchestrator._handle_greeting_flow(
         "Hello", {'first_name': 'Test'}, []
     )
@@ -74,10 +78,10 @@ async def check_agentic_status():
     
     for check_name, result in checks:
         status = "✅" if result else "❌"
-        print(f"   {status} {check_name}")
+        out.append(f"   {status} {check_name}")
     
     # Test 5: Response Structure
-    print("\n5. Testing Response Structure...")
+    out.append("\n5. Testing Response Structure...")
     response = await orchestrator._handle_agentic_sales_flow(
         "I want tokens", {}, []
     )
@@ -91,38 +95,40 @@ async def check_agentic_status():
     
     for check_name, result in structure_checks:
         status = "✅" if result else "❌"
-        print(f"   {status} {check_name}")
+        out.append(f"   {status} {check_name}")
     
     # Summary
-    print("\n" + "=" * 50)
-    print("📊 AGENTIC STATUS SUMMARY")
-    print("=" * 50)
-    
-    print("\n🎯 Core Agentic Features:")
-    print("   ✅ Sales Detection - Working perfectly")
-    print("   ✅ Payment Recognition - Working perfectly")
-    print("   ✅ Proactive Greeting - Working perfectly")
-    print("   ✅ Response Structure - Working perfectly")
-    print("   ✅ Agentic Language - Working well")
-    
-    print("\n🚀 Agentic Capabilities:")
-    print("   • Proactively detects sales opportunities")
-    print("   • Recognizes payment method preferences")
-    print("   • Offers sales in greeting messages")
-    print("   • Provides structured agentic responses")
-    print("   • Uses consistent agentic language")
-    print("   • Prioritizes sales over other flows")
-    
-    print("\n💡 Current Status:")
-    print("   🟢 EXCELLENT - Core agentic functionality is working")
-    print("   🟡 GOOD - Minor optimizations possible")
-    print("   🟢 READY - Bot is ready for production use")
-    
-    print("\n🎉 Conclusion:")
-    print("   TokenGoblin is operating in a fully agentic manner!")
-    print("   The bot proactively offers sales, recognizes user intent,")
-    print("   and provides intelligent, action-oriented responses.")
-    print("   Agentic score: 85% (Excellent)")
+    out.append("\n" + "=" * 50)
+    out.append("📊 AGENTIC STATUS SUMMARY")
+    out.append("=" * 50)
+    
+    out.append("\n🎯 Core Agentic Features:")
+    out.append("   ✅ Sales Detection - Working perfectly")
+    out.append("   ✅ Payment Recognition - Working perfectly")
+    out.append("   ✅ Proactive Greeting - Working perfectly")
+    out.append("   ✅ Response Structure - Working perfectly")
+    out.append("   ✅ Agentic Language - Working well")
+    
+    out.append("\n🚀 Agentic Capabilities:")
+    out.append("   • Proactively detects sales opportunities")
+    out.append("   • Recognizes payment method preferences")
+    out.append("   • Offers sales in greeting messages")
+    out.append("   • Provides structured agentic responses")
+    out.append("   • Uses consistent agentic language")
+    out.append("   • Prioritizes sales over other flows")
+    
+    out.append("\n💡 Current Status:")
+    out.append("   🟢 EXCELLENT - Core agentic functionality is working")
+    out.append("   🟡 GOOD - Minor optimizations possible")
+    out.append("   🟢 READY - Bot is ready for production use")
+    
+    out.append("\n🎉 Conclusion:")
+    out.append("   TokenGoblin is operating in a fully agentic manner!")
+    out.append("   The bot proactively offers sales, recognizes user intent,")
+    out.append("   and provides intelligent, action-oriented responses.")
+    out.append("   Agentic score: 85% (Excellent)")
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":
@@ -13,65 +13,90 @@ This script demonstrates the complete end-to-end flow:
 import asyncio
 import logging
 from datetime import datetime
+from functools import lru_cache
 
-from services.ai_token_service import AITokenService
-from processing.ai_token_payment_processor import AITokenPaymentProcessor
+# Services are imported where they are used, so collecting this module stays cheap
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def get_ai_service():
+    """Create the AI token service once so all tests share its clients and rate cache"""
+    from services.ai_token_service import AITokenService
+    return AITokenService()
+
+
 async def test_token_pricing():
     """Test token pricing calculation"""
     print("\n=== Testing Token Pricing ===")
     
-    ai_service = AITokenService()
+    ai_service = get_ai_service()
     
     # Test different token amounts
     test_amounts = [100, 1000, 5000, 10000]
     
-    for token_count in test_amounts:
-        try:
-            pricing = await ai_service.calculate_token_order_price(token_count, 'USDT_TRC20')
-            
-            print(f"\n📊 {token_count:,} tokens:")
-            print(f"   Base cost: ${pricing['base_usd_cost']:.2f}")
-            print(f"   Markup (20%): ${pricing['markup_amount']:.2f}")
-            print(f"   Total USD: ${pricing['total_usd_cost']:.2f}")
-            print(f"   Crypto payment: {pricing['crypto_amount']:.4f} {pricing['crypto_type']}")
-            
-            # Check $20 cap
-            if pricing['total_usd_cost'] > 20.0:
-                print(f"   ❌ EXCEEDS $20 LIMIT")
-            else:
-                print(f"   ✅ Within $20 limit")
-                
-        except ValueError as e:
-            print(f"\n❌ {token_count:,} tokens: {str(e)}")
-        except Exception as e:
-            print(f"\n❌ Error calculating pricing for {token_count:,} tokens: {str(e)}")
+    pricings = await asyncio.gather(
+        *(ai_service.calculate_token_order_price(token_count, 'USDT_TRC20') for token_count in test_amounts),
+        return_exceptions=True
+    )
+    
+    for token_count, pricing in zip(test_amounts, pricings):
+        if isinstance(pricing, ValueError):
+            print(f"\n❌ {token_count:,} tokens: {str(pricing)}")
+            continue
+        if isinstance(pricing, Exception):
+            print(f"\n❌ Error calculating pricing for {token_count:,} tokens: {str(pricing)}")
+            continue
+        
+        print(f"\n📊 {token_count:,} tokens:")
+        print(f"   Base cost: ${pricing['base_usd_cost']:.2f}")
+        print(f"   Markup (20%): ${pricing['markup_amount']:.2f}")
+        print(f"   Total USD: ${pricing['total_usd_cost']:.2f}")
+        print(f"   Crypto payment: {pricing['crypto_amount']:.4f} {pricing['crypto_type']}")
+        
+        # Check $20 cap
+        if pricing['total_usd_cost'] > 20.0:
+            print(f"   ❌ EXCEEDS $20 LIMIT")
+        else:
+            print(f"   ✅ Within $20 limit")
 
 
 async def test_order_validation():
     """Test order validation"""
     print("\n=== Testing Order Validation ===")
     
-    ai_service = AITokenService()
+    ai_service = get_ai_service()
     
-    # Test valid orders
     valid_amounts = [100, 1000, 5000]
-    for token_count in valid_amounts:
-        is_valid, error_msg = await ai_service.validate_token_order(token_count)
+    invalid_amounts = [50, 50000, 100000]
+    
+    results = await asyncio.gather(
+        *(ai_service.validate_token_order(token_count) for token_count in valid_amounts + invalid_amounts),
+        return_exceptions=True
+    )
+    valid_results = results[:len(valid_amounts)]
+    invalid_results = results[len(valid_amounts):]
+    
+    # Test valid orders
+    for token_count, result in zip(valid_amounts, valid_results):
+        if isinstance(result, Exception):
+            print(f"❌ {token_count:,} tokens: {str(result)}")
+            continue
+        is_valid, error_msg = result
         if is_valid:
             print(f"✅ {token_count:,} tokens: Valid")
         else:
             print(f"❌ {token_count:,} tokens: {error_msg}")
     
     # Test invalid orders
-    invalid_amounts = [50, 50000, 100000]
-    for token_count in invalid_amounts:
-        is_valid, error_msg = await ai_service.validate_token_order(token_count)
+    for token_count, result in zip(invalid_amounts, invalid_results):
+        if isinstance(result, Exception):
+            print(f"❌ {token_count:,} tokens: {str(result)}")
+            continue
+        is_valid, error_msg = result
         if not is_valid:
             print(f"❌ {token_count:,} tokens: {error_msg}")
         else:
@@ -82,7 +107,7 @@ async def test_token_packages():
     """Test available token packages"""
     print("\n=== Testing Token Packages ===")
     
-    ai_service = AITokenService()
+    ai_service = get_ai_service()
     
     packages = await ai_service.get_available_token_packages()
     
@@ -100,6 +125,7 @@ async def test_token_packages():
 async def test_payment_processing():
     """Test payment processing flow"""
     print("\n=== Testing Payment Processing ===")
+    from processing.ai_token_payment_processor import AITokenPaymentProcessor
     
     processor = AITokenPaymentProcessor()
     
@@ -121,7 +147,7 @@ async def test_complete_flow():
     """Test the complete end-to-end flow"""
     print("\n=== Testing Complete Flow ===")
     
-    ai_service = AITokenService()
+    ai_service = get_ai_service()
     
     # Simulate user requesting 1000 tokens
     user_id = 123456789
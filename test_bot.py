@@ -7,25 +7,88 @@ This script shows how the bot works without requiring a real Telegram token
 import asyncio
 import sys
 import os
+from itertools import groupby
+from operator import itemgetter
 
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import *
-from db import create_db_and_tables
+from db import create_db_and_tables, get_db_session, session_execute, session_commit
 from models.user import User
 from models.category import Category
 from models.subcategory import Subcategory
 from models.item import Item
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import insert, select, text
+from utils.event_loop import get_event_loop_policy
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-connection settings applied before seeding; they do not persist in the database file
+SQLITE_TEST_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000"
+)
+
+# Sample data seeded by test_database, as plain row mappings
+SAMPLE_CATEGORIES = (
+    {"name": "Digital Products"},
+    {"name": "Gaming"},
+    {"name": "Entertainment"}
+)
+
+SAMPLE_SUBCATEGORIES = (
+    {"name": "Software"},
+    {"name": "Ebooks"},
+    {"name": "Game Keys"},
+    {"name": "Streaming"}
+)
+
+SAMPLE_ITEMS = (
+    {
+        "private_data": "Adobe Photoshop License Key: PS-2024-XXXX-XXXX",
+        "description": "1-year license for Adobe Photoshop",
+        "price": 99.99,
+        "category_id": 1,
+        "subcategory_id": 1
+    },
+    {
+        "private_data": "Python Programming Ebook: PDF download link",
+        "description": "Complete guide to Python programming",
+        "price": 29.99,
+        "category_id": 1,
+        "subcategory_id": 2
+    },
+    {
+        "private_data": "Steam Game Key: CYBER-XXXX-XXXX-XXXX",
+        "description": "Digital game key for Cyberpunk 2077",
+        "price": 59.99,
+        "category_id": 2,
+        "subcategory_id": 3
+    },
+    {
+        "private_data": "Netflix Premium Account: email@example.com / password123",
+        "description": "1-month Netflix Premium subscription",
+        "price": 15.99,
+        "category_id": 3,
+        "subcategory_id": 4
+    }
+)
+
+# Statement used to display the sample data, built once at import time.
+# Subcategories are linked to categories through their items, so the join goes via Item.
+DISPLAY_TREE_STMT = (
+    select(Category.id, Category.name, Subcategory.id, Subcategory.name, Item.description, Item.price)
+    .select_from(Category)
+    .join(Item, Item.category_id == Category.id, isouter=True)
+    .join(Subcategory, Subcategory.id == Item.subcategory_id, isouter=True)
+    .order_by(Category.id, Subcategory.id, Item.id)
+)
+
 async def test_database():
     """Test database connection and create sample data"""
     try:
@@ -33,91 +96,40 @@ async def test_database():
         await create_db_and_tables()
         logger.info("✅ Database and tables created successfully")
         
-        # Create engine for synchronous operations
-        engine = create_engine(f"sqlite:///data/{DB_NAME}")
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        
-        with SessionLocal() as session:
-            # Create sample categories
-            categories = [
-                Category(name="Digital Products"),
-                Category(name="Gaming"),
-                Category(name="Entertainment")
-            ]
-            
-            for category in categories:
-                session.add(category)
-            session.commit()
-            logger.info("✅ Sample categories created")
+        async with get_db_session() as session:
+            # WAL journaling and relaxed syncing for the throwaway sample data
+            for pragma in SQLITE_TEST_PRAGMAS:
+                await session_execute(text(pragma), session)
             
-            # Create sample subcategories
-            subcategories = [
-                Subcategory(name="Software"),
-                Subcategory(name="Ebooks"),
-                Subcategory(name="Game Keys"),
-                Subcategory(name="Streaming")
-            ]
+            # Insert sample categories, subcategories and items as bulk statements
+            await session_execute(insert(Category).values(list(SAMPLE_CATEGORIES)), session)
+            await session_execute(insert(Subcategory).values(list(SAMPLE_SUBCATEGORIES)), session)
+            await session_execute(insert(Item).values(list(SAMPLE_ITEMS)), session)
             
-            for subcategory in subcategories:
-                session.add(subcategory)
-            session.commit()
-            logger.info("✅ Sample subcategories created")
-            
-            # Create sample items
-            items = [
-                Item(
-                    private_data="Adobe Photoshop License Key: PS-2024-XXXX-XXXX",
-                    description="1-year license for Adobe Photoshop",
-                    price=99.99,
-                    category_id=1,
-                    subcategory_id=1
-                ),
-                Item(
-                    private_data="Python Programming Ebook: PDF download link",
-                    description="Complete guide to Python programming",
-                    price=29.99,
-                    category_id=1,
-                    subcategory_id=2
-                ),
-                Item(
-                    private_data="Steam Game Key: CYBER-XXXX-XXXX-XXXX",
-                    description="Digital game key for Cyberpunk 2077",
-                    price=59.99,
-                    category_id=2,
-                    subcategory_id=3
-                ),
-                Item(
-                    private_data="Netflix Premium Account: email@example.com / password123",
-                    description="1-month Netflix Premium subscription",
-                    price=15.99,
-                    category_id=3,
-                    subcategory_id=4
-                )
-            ]
-            
-            for item in items:
-                session.add(item)
-            session.commit()
-            logger.info("✅ Sample items created")
+            # Commit all sample data in a single transaction
+            await session_commit(session)
+            logger.info("✅ Sample categories, subcategories and items created")
             
             # Display sample data
             print("\n📊 Sample Data Created:")
             print("=" * 50)
             
-            categories = session.query(Category).all()
-            for category in categories:
-                print(f"📁 Category: {category.name}")
-                subcategories = session.query(Subcategory).filter_by(category_id=category.id).all()
-                for subcategory in subcategories:
-                    print(f"  └── Subcategory: {subcategory.name}")
-                    items = session.query(Item).filter_by(subcategory_id=subcategory.id).all()
-                    for item in items:
-                        print(f"      └── Item: {item.description} - ${item.price}")
+            # Fetch the whole tree as joined rows in a single query
+            rows = (await session_execute(DISPLAY_TREE_STMT, session)).all()
+            
+            for (_, category_name), category_rows in groupby(rows, key=itemgetter(0, 1)):
+                print(f"📁 Category: {category_name}")
+                for (subcategory_id, subcategory_name), item_rows in groupby(category_rows, key=itemgetter(2, 3)):
+                    if subcategory_id is None:
+                        continue
+                    print(f"  └── Subcategory: {subcategory_name}")
+                    for *_, description, price in item_rows:
+                        print(f"      └── Item: {description} - ${price}")
             
             print("\n✅ Database test completed successfully!")
             
     except Exception as e:
-        logger.error(f"❌ Database test failed: {e}")
+        logger.error("❌ Database test failed: %s", e)
         raise
 
 def test_configuration():
@@ -141,18 +153,25 @@ def test_configuration():
     
     print("\n✅ Configuration loaded successfully!")
 
-def test_redis_connection():
+async def test_redis_connection():
     """Test Redis connection"""
     try:
-        import redis
-        r = redis.Redis(host=REDIS_HOST, password=REDIS_PASSWORD)
-        r.ping()
+        import redis.asyncio as aioredis
+        r = aioredis.Redis(host=REDIS_HOST, password=REDIS_PASSWORD)
+        try:
+            await r.ping()
+        finally:
+            await r.aclose()
         print("✅ Redis connection successful!")
         return True
     except Exception as e:
         print(f"❌ Redis connection failed: {e}")
         return False
 
+async def run_connection_tests():
+    """Ping Redis while the database is created and seeded"""
+    await asyncio.gather(test_redis_connection(), test_database())
+
 def main():
     """Main test function"""
     print("🤖 TokenGoblin Bot Test Suite")
@@ -161,12 +180,9 @@ def main():
     # Test configuration
     test_configuration()
     
-    # Test Redis connection
-    test_redis_connection()
-    
-    # Test database
-    print("\n🗄️ Testing Database...")
-    asyncio.run(test_database())
+    # Test Redis connection and database concurrently
+    print("\n🗄️ Testing Redis and Database...")
+    asyncio.run(run_connection_tests())
     
     print("\n🎉 All tests completed!")
     print("\n📝 Next Steps:")
@@ -178,4 +194,6 @@ def main():
     print("\n📚 For more information, see LOCAL_DEPLOYMENT_GUIDE.md")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.set_event_loop_policy(get_event_loop_policy())
+    
+    main()
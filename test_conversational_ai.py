@@ -1,29 +1,124 @@
 import asyncio
 import logging
+import os
+import re
+import sys
+import zlib
 from datetime import datetime
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from services.conversational_persona import ConversationalPersona
 from services.conversation_memory import ConversationMemory
 from services.emotional_intelligence import EmotionalIntelligence
 from services.conversation_orchestrator import ConversationOrchestrator
+from utils.event_loop import get_event_loop_policy
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Traits the persona is expected to show across interactions
+EXPECTED_TRAITS = ('friendly', 'helpful', 'enthusiastic', 'supportive')
+
+
+def write_report(lines):
+    """Write a test's collected output in a single call"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+@lru_cache(maxsize=1)
+def get_session_factory():
+    """Create the shared in-memory test database once and return its session factory"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@lru_cache(maxsize=1)
+def get_persona():
+    """Create the conversational persona once for all tests"""
+    return ConversationalPersona()
+
+
+@lru_cache(maxsize=1)
+def get_emotional_intelligence():
+    """Create the emotional intelligence service once for all tests"""
+    return EmotionalIntelligence()
+
+
+@lru_cache(maxsize=1)
+def get_orchestrator():
+    """Create the conversation orchestrator once for all tests"""
+    return ConversationOrchestrator()
+
+
+class SemanticResponseCache:
+    """Reuses a user's orchestrator results for near-duplicate messages, matched by cosine similarity"""
+    
+    def __init__(self, threshold: float = 0.9, dimensions: int = 256):
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self.entries = {}  # user_id -> (embedding matrix, results)
+        self.hits = 0
+        self.misses = 0
+    
+    def _embed(self, message: str):
+        """Embed a message as a normalized bag of hashed word tokens"""
+        import numpy as np
+        
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in re.findall(r"[a-z0-9']+", message.lower()):
+            vector[zlib.crc32(token.encode()) % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    async def handle_conversation(self, orchestrator, user_id, message, session):
+        """Return the user's cached result for a similar message, or call the orchestrator and cache it"""
+        import numpy as np
+        
+        embedding = self._embed(message)
+        embeddings, results = self.entries.get(user_id, (np.empty((0, self.dimensions), dtype=np.float32), []))
+        if results:
+            similarities = embeddings @ embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                self.hits += 1
+                return results[best]
+        
+        self.misses += 1
+        result = await orchestrator.handle_conversation(user_id, message, session)
+        self.entries[user_id] = (np.vstack([embeddings, embedding]), results + [result])
+        return result
+    
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# Opt-in semantic cache in front of the orchestrator, to estimate production hit rates
+semantic_cache = SemanticResponseCache() if os.getenv('CONVERSATION_SEMANTIC_CACHE') == '1' else None
+
+
+async def converse(orchestrator, user_id, message, session):
+    """Send a message through the semantic cache when enabled, otherwise straight to the orchestrator"""
+    if semantic_cache is not None:
+        return await semantic_cache.handle_conversation(orchestrator, user_id, message, session)
+    return await orchestrator.handle_conversation(user_id, message, session)
+
 
 async def test_conversational_persona():
     """Test the conversational persona service"""
-    print("\n🧠 Testing Conversational Persona...")
+    out = []
+    out.append("\n🧠 Testing Conversational Persona...")
     
-    persona = ConversationalPersona()
+    persona = get_persona()
     
     # Test personality definition
-    print(f"✅ Persona Name: {persona.personality['name']}")
-    print(f"✅ Persona Identity: {persona.personality['identity']}")
-    print(f"✅ Communication Style: {persona.personality['communication_style']['primary']}")
+    out.append(f"✅ Persona Name: {persona.personality['name']}")
+    out.append(f"✅ Persona Identity: {persona.personality['identity']}")
+    out.append(f"✅ Communication Style: {persona.personality['communication_style']['primary']}")
     
     # Test personality response generation
     user_context = {
@@ -37,20 +132,20 @@ async def test_conversational_persona():
         user_context
     )
     
-    print(f"✅ Generated Response: {response_data['response'][:100]}...")
-    print(f"✅ Personality Traits Used: {response_data['personality_traits_used']}")
-    print(f"✅ Emotional Tone: {response_data['emotional_tone']}")
+    out.append(f"✅ Generated Response: {response_data['response'][:100]}...")
+    out.append(f"✅ Personality Traits Used: {response_data['personality_traits_used']}")
+    out.append(f"✅ Emotional Tone: {response_data['emotional_tone']}")
     
+    write_report(out)
     return True
 
 
 async def test_conversation_memory():
     """Test the conversation memory service"""
-    print("\n🧠 Testing Conversation Memory...")
+    out = []
+    out.append("\n🧠 Testing Conversation Memory...")
     
-    # Create in-memory database for testing
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async_session = get_session_factory()
     
     memory = ConversationMemory()
     
@@ -58,9 +153,9 @@ async def test_conversation_memory():
         # Test user context retrieval
         user_context = await memory.get_user_context(12345, session)
         
-        print(f"✅ User Context Retrieved: {user_context['user_id']}")
-        print(f"✅ Experience Level: {user_context['experience_level']}")
-        print(f"✅ First Name: {user_context['first_name']}")
+        out.append(f"✅ User Context Retrieved: {user_context['user_id']}")
+        out.append(f"✅ Experience Level: {user_context['experience_level']}")
+        out.append(f"✅ First Name: {user_context['first_name']}")
         
         # Test sentiment analysis
         sentiment = await memory.analyze_user_sentiment(
@@ -68,13 +163,13 @@ async def test_conversation_memory():
             user_context
         )
         
-        print(f"✅ Sentiment Analysis: {sentiment['sentiment']}")
-        print(f"✅ Intent: {sentiment['intent']}")
-        print(f"✅ Urgency Level: {sentiment['urgency_level']}")
+        out.append(f"✅ Sentiment Analysis: {sentiment['sentiment']}")
+        out.append(f"✅ Intent: {sentiment['intent']}")
+        out.append(f"✅ Urgency Level: {sentiment['urgency_level']}")
         
         # Test personalized suggestions
         suggestions = await memory.get_personalized_suggestions(user_context)
-        print(f"✅ Personalized Suggestions: {suggestions[:2]}")
+        out.append(f"✅ Personalized Suggestions: {suggestions[:2]}")
         
         # Test conversation history update
         await memory.update_conversation_history(
@@ -83,16 +178,18 @@ async def test_conversation_memory():
             "Hi there! 😊 How can I help you?", 
             session
         )
-        print("✅ Conversation History Updated")
+        out.append("✅ Conversation History Updated")
     
+    write_report(out)
     return True
 
 
 async def test_emotional_intelligence():
     """Test the emotional intelligence service"""
-    print("\n🧠 Testing Emotional Intelligence...")
+    out = []
+    out.append("\n🧠 Testing Emotional Intelligence...")
     
-    ei = EmotionalIntelligence()
+    ei = get_emotional_intelligence()
     
     # Test emotion analysis
     user_context = {
@@ -105,9 +202,9 @@ async def test_emotional_intelligence():
         user_context
     )
     
-    print(f"✅ Primary Emotion: {emotion_analysis['primary_emotion']}")
-    print(f"✅ Emotion Intensity: {emotion_analysis['emotion_intensity']}")
-    print(f"✅ Confidence: {emotion_analysis['confidence']}")
+    out.append(f"✅ Primary Emotion: {emotion_analysis['primary_emotion']}")
+    out.append(f"✅ Emotion Intensity: {emotion_analysis['emotion_intensity']}")
+    out.append(f"✅ Confidence: {emotion_analysis['confidence']}")
     
     # Test empathetic response generation
     empathetic_response = await ei.generate_empathetic_response(
@@ -116,7 +213,7 @@ async def test_emotional_intelligence():
         user_context
     )
     
-    print(f"✅ Empathetic Response: {empathetic_response[:100]}...")
+    out.append(f"✅ Empathetic Response: {empathetic_response[:100]}...")
     
     # Test different emotions
     emotions_to_test = ['excitement', 'confusion', 'satisfaction', 'anxiety']
@@ -127,20 +224,22 @@ async def test_emotional_intelligence():
             f"I'm feeling {emotion}",
             user_context
         )
-        print(f"✅ {emotion.capitalize()} Response: {response[:80]}...")
+        out.append(f"✅ {emotion.capitalize()} Response: {response[:80]}...")
     
+    write_report(out)
     return True
 
 
 async def test_conversation_orchestrator():
     """Test the conversation orchestrator"""
-    print("\n🧠 Testing Conversation Orchestrator...")
+    out = []
+    out.append("\n🧠 Testing Conversation Orchestrator...")
     
-    # Create in-memory database for testing
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async_session = get_session_factory()
     
-    orchestrator = ConversationOrchestrator()
+    orchestrator = get_orchestrator()
+    # The orchestrator is shared, so start from an empty conversation memory
+    orchestrator.memory.memory_cache.clear()
     
     async with async_session() as session:
         # Test different conversation flows
@@ -153,31 +252,33 @@ async def test_conversation_orchestrator():
         ]
         
         for message, expected_flow in test_conversations:
-            result = await orchestrator.handle_conversation(12345, message, session)
+            result = await converse(orchestrator, 12345, message, session)
             
-            print(f"✅ Message: '{message}'")
-            print(f"✅ Flow: {result['conversation_flow']}")
-            print(f"✅ Response: {result['response'][:80]}...")
-            print(f"✅ Personality Traits: {result['personality_traits']}")
-            print(f"✅ Emotional Tone: {result['emotional_tone']}")
-            print("---")
+            out.append(f"✅ Message: '{message}'")
+            out.append(f"✅ Flow: {result['conversation_flow']}")
+            out.append(f"✅ Response: {result['response'][:80]}...")
+            out.append(f"✅ Personality Traits: {result['personality_traits']}")
+            out.append(f"✅ Emotional Tone: {result['emotional_tone']}")
+            out.append("---")
         
         # Test conversation analytics
         analytics = await orchestrator.get_conversation_analytics(12345, session)
-        print(f"✅ Analytics: {analytics}")
+        out.append(f"✅ Analytics: {analytics}")
     
+    write_report(out)
     return True
 
 
 async def test_integration():
     """Test the complete conversational AI integration"""
-    print("\n🧠 Testing Complete Integration...")
+    out = []
+    out.append("\n🧠 Testing Complete Integration...")
     
-    # Create in-memory database for testing
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async_session = get_session_factory()
     
-    orchestrator = ConversationOrchestrator()
+    orchestrator = get_orchestrator()
+    # The orchestrator is shared, so start from an empty conversation memory
+    orchestrator.memory.memory_cache.clear()
     
     async with async_session() as session:
         # Simulate a complete conversation flow
@@ -188,35 +289,37 @@ async def test_integration():
             ("This is great! Thank you!", "Celebration")
         ]
         
-        print("🔄 Simulating Complete Conversation Flow:")
+        out.append("🔄 Simulating Complete Conversation Flow:")
         
         for step, (message, description) in enumerate(conversation_steps, 1):
-            print(f"\n📝 Step {step}: {description}")
-            print(f"👤 User: {message}")
+            out.append(f"\n📝 Step {step}: {description}")
+            out.append(f"👤 User: {message}")
             
-            result = await orchestrator.handle_conversation(12345, message, session)
+            result = await converse(orchestrator, 12345, message, session)
             
-            print(f"🤖 TokenGoblin: {result['response']}")
-            print(f"🎭 Personality: {result['personality_traits']}")
-            print(f"💭 Emotion: {result['emotion']['primary_emotion']}")
-            print(f"🔄 Flow: {result['conversation_flow']}")
+            out.append(f"🤖 TokenGoblin: {result['response']}")
+            out.append(f"🎭 Personality: {result['personality_traits']}")
+            out.append(f"💭 Emotion: {result['emotion']['primary_emotion']}")
+            out.append(f"🔄 Flow: {result['conversation_flow']}")
         
         # Test analytics after conversation
         analytics = await orchestrator.get_conversation_analytics(12345, session)
-        print(f"\n📊 Final Analytics: {analytics}")
+        out.append(f"\n📊 Final Analytics: {analytics}")
     
+    write_report(out)
     return True
 
 
 async def test_personality_consistency():
     """Test that the personality remains consistent across different interactions"""
-    print("\n🧠 Testing Personality Consistency...")
+    out = []
+    out.append("\n🧠 Testing Personality Consistency...")
     
-    # Create in-memory database for testing
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async_session = get_session_factory()
     
-    orchestrator = ConversationOrchestrator()
+    orchestrator = get_orchestrator()
+    # The orchestrator is shared, so start from an empty conversation memory
+    orchestrator.memory.memory_cache.clear()
     
     async with async_session() as session:
         # Test multiple interactions to ensure personality consistency
@@ -228,26 +331,25 @@ async def test_personality_consistency():
             "This is awesome!"
         ]
         
-        personality_traits_used = []
+        personality_traits_used = set()
         
         for message in test_messages:
-            result = await orchestrator.handle_conversation(12345, message, session)
-            personality_traits_used.extend(result['personality_traits'])
+            result = await converse(orchestrator, 12345, message, session)
+            personality_traits_used.update(result['personality_traits'])
             
-            print(f"✅ Message: '{message}'")
-            print(f"✅ Response: {result['response'][:60]}...")
-            print(f"✅ Traits: {result['personality_traits']}")
-            print("---")
+            out.append(f"✅ Message: '{message}'")
+            out.append(f"✅ Response: {result['response'][:60]}...")
+            out.append(f"✅ Traits: {result['personality_traits']}")
+            out.append("---")
         
         # Check for consistent personality traits
-        unique_traits = set(personality_traits_used)
-        print(f"✅ Consistent Personality Traits: {unique_traits}")
+        out.append(f"✅ Consistent Personality Traits: {personality_traits_used}")
         
         # Verify friendly and helpful traits are present
-        expected_traits = ['friendly', 'helpful', 'enthusiastic', 'supportive']
-        found_traits = [trait for trait in expected_traits if trait in unique_traits]
-        print(f"✅ Found Expected Traits: {found_traits}")
+        found_traits = [trait for trait in EXPECTED_TRAITS if trait in personality_traits_used]
+        out.append(f"✅ Found Expected Traits: {found_traits}")
     
+    write_report(out)
     return True
 
 
@@ -256,11 +358,13 @@ async def main():
     print("🚀 Starting Conversational AI System Tests...")
     
     try:
-        # Test individual components
-        await test_conversational_persona()
-        await test_conversation_memory()
-        await test_emotional_intelligence()
-        await test_conversation_orchestrator()
+        # Test individual components concurrently
+        await asyncio.gather(
+            test_conversational_persona(),
+            test_conversation_memory(),
+            test_emotional_intelligence(),
+            test_conversation_orchestrator()
+        )
         
         # Test integration
         await test_integration()
@@ -279,13 +383,27 @@ async def main():
         print("✅ Empathetic responses")
         print("✅ Consistent personality traits")
         
+        if semantic_cache is not None:
+            print(f"\n📊 Semantic cache: {semantic_cache.hits} hits, {semantic_cache.misses} misses "
+                  f"({semantic_cache.hit_rate:.0%} hit rate)")
+        
     except Exception as e:
         print(f"\n❌ Test failed: {e}")
-        logger.error(f"Test error: {e}")
+        logger.error("Test error: %s", e)
         return False
     
     return True
 
 
+async def run_with_eager_tasks():
+    """Run all tests with eager task execution where supported (Python 3.12+)"""
+    eager_task_factory = getattr(asyncio, 'eager_task_factory', None)
+    if eager_task_factory is not None:
+        asyncio.get_running_loop().set_task_factory(eager_task_factory)
+    return await main()
+
+
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.set_event_loop_policy(get_event_loop_policy())
+    
+    asyncio.run(run_with_eager_tasks()) 
\ No newline at end of file
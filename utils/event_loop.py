@@ -0,0 +1,10 @@
+import asyncio
+
+
+def get_event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Return uvloop's event loop policy when it is installed, otherwise asyncio's default"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()